@@ -1,30 +1,153 @@
 """Extract features from Git repository history."""
 
+import hashlib
+import os
+import pickle
+import re
 import subprocess
 import json
-from datetime import datetime
+import time
 from pathlib import Path
-from typing import Dict, List, Any
-from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Any
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Bump when the shape of extracted features changes to invalidate old caches
+_CACHE_VERSION = 4
+
+# git log --pretty=format:%H%x1f%aN%x1f%aE%x1f%at%x1f%s (unit-separated, so
+# names and subjects may contain any printable character)
+_COMMIT_HEADER_RE = re.compile(
+    r"([0-9a-f]{40,64})\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f(\d+)\x1f(.*)"
+)
+# --numstat line: "<additions>\t<deletions>\t<path>"
+_NUMSTAT_RE = re.compile(r"(\d+)\t(\d+)\t(.+)")
+
+
+def _file_extension(path: str) -> str:
+    """Get a file's suffix like ``PurePath.suffix``, without building a path."""
+    name = path.rpartition("/")[2]
+    dot = name.rfind(".")
+    if 0 < dot < len(name) - 1:
+        return name[dot:]
+    return "no-extension"
+
+
+def _month(timestamp: int) -> str:
+    """Format a Unix timestamp as a local-time "YYYY-MM" bucket."""
+    return time.strftime("%Y-%m", time.localtime(timestamp))
+
+
+def commit_arrays(commits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-commit numeric columns and the ranges used to normalize them."""
+    timestamps = np.fromiter((c["timestamp"] for c in commits), dtype=np.int64)
+    additions = np.fromiter((c["additions"] for c in commits), dtype=np.int64)
+    deletions = np.fromiter((c["deletions"] for c in commits), dtype=np.int64)
+    activity = additions + deletions
+    
+    return {
+        "timestamps": timestamps,
+        "additions": additions,
+        "deletions": deletions,
+        "activity": activity,
+        "min_time": int(timestamps.min()) if len(commits) else 0,
+        "max_time": int(timestamps.max()) if len(commits) else 0,
+        "max_activity": int(activity.max()) if len(commits) else 0,
+    }
 
 
 class RepositoryAnalyzer:
     """Analyze Git repository and extract artistic features."""
     
-    def __init__(self, repo_path: str):
+    def __init__(
+        self,
+        repo_path: str,
+        use_cache: bool = True,
+        use_libgit2: bool = False
+    ):
         self.repo_path = Path(repo_path).resolve()
         if not (self.repo_path / ".git").exists():
             raise ValueError(f"Not a git repository: {repo_path}")
+        self.use_cache = use_cache
+        self.use_libgit2 = use_libgit2
     
-    def extract_features(self) -> Dict[str, Any]:
-        """Extract all features for art generation."""
-        return {
-            "commits": self._get_commits(),
-            "file_stats": self._get_file_stats(),
-            "contributors": self._get_contributors(),
-            "timeline": self._get_timeline(),
-            "branches": self._get_branches(),
+    def extract_features(self, with_stats: bool = True) -> Dict[str, Any]:
+        """Extract all features for art generation.
+        
+        Without ``with_stats`` per-commit line counts are skipped (left at
+        zero), which makes reading the history much cheaper when only commit
+        counts and timing are needed.
+        """
+        # Independent git queries block on subprocess I/O, so overlap them
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            history_future = pool.submit(self._get_history, with_stats)
+            file_stats_future = pool.submit(self._get_file_stats)
+            branches_future = pool.submit(self._get_branches)
+            
+            return {
+                **history_future.result(),
+                "file_stats": file_stats_future.result(),
+                "branches": branches_future.result(),
+            }
+    
+    def _get_history(self, with_stats: bool = True) -> Dict[str, Any]:
+        """Get commits and the features derived from them.
+        
+        These depend only on the commit graph, so they are cached on disk per
+        repository and HEAD commit; repeated runs against an unchanged history
+        skip parsing the log. Index- and ref-based features are not cached.
+        """
+        cache_path = self._cache_path(with_stats) if self.use_cache else None
+        if cache_path is not None and cache_path.exists():
+            try:
+                with open(cache_path, "rb") as f:
+                    return pickle.load(f)
+            except Exception:
+                # Best effort: unreadable or incompatible caches are rebuilt
+                pass
+        
+        commits = self._get_commits(with_stats)
+        history = {
+            "commits": commits,
+            "contributors": self._get_contributors(commits),
+            "timeline": self._get_timeline(commits),
+            **commit_arrays(commits),
         }
+        
+        if cache_path is not None:
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(history, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+        
+        return history
+    
+    def _cache_path(self, with_stats: bool = True) -> Optional[Path]:
+        """Get the history cache file for the current HEAD, if there is one."""
+        try:
+            head = self._run_git("rev-parse", "HEAD")
+        except subprocess.CalledProcessError:
+            return None
+        
+        backend = "libgit2" if self.use_libgit2 and pygit2 is not None else "git"
+        cache_root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        key = f"{_CACHE_VERSION}:{backend}:{with_stats}:{self.repo_path}".encode()
+        repo_hash = hashlib.sha1(key).hexdigest()[:16]
+        return Path(cache_root) / "repo-art" / f"{repo_hash}-{head}.pkl"
     
     def _run_git(self, *args) -> str:
         """Run git command and return output."""
@@ -36,113 +159,197 @@ class RepositoryAnalyzer:
         )
         return result.stdout.strip()
     
-    def _get_commits(self) -> List[Dict[str, Any]]:
-        """Get commit history with metadata."""
+    def _stream_git(self, *args) -> Iterator[str]:
+        """Run git command and yield its output line by line."""
+        with subprocess.Popen(
+            ["git", "-C", str(self.repo_path)] + list(args),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1
+        ) as proc:
+            for line in proc.stdout:
+                yield line.rstrip("\n")
+        
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+    
+    def _get_commits(self, with_stats: bool = True) -> List[Dict[str, Any]]:
+        """Get commit history with metadata.
+        
+        With ``use_libgit2`` the object database is read in-process through
+        pygit2 when it is installed; otherwise ``git log`` is parsed. Without
+        ``with_stats`` per-file line counts are skipped and left at zero.
+        """
+        if self.use_libgit2 and pygit2 is not None:
+            try:
+                return self._get_commits_libgit2(with_stats)
+            except (pygit2.GitError, KeyError, ValueError):
+                pass
+        
         try:
-            log = self._run_git(
-                "log",
-                "--pretty=format:%H|%an|%ae|%at|%s",
-                "--numstat",
-                "--no-merges"
-            )
+            return list(self._iter_commits(with_stats))
         except subprocess.CalledProcessError:
             return []
+    
+    def _get_commits_libgit2(self, with_stats: bool = True) -> List[Dict[str, Any]]:
+        """Get commit history with metadata by walking the repo with pygit2.
         
+        Mirrors ``git log --numstat --no-merges``: newest first, merge commits
+        skipped, authors resolved through .mailmap, binary files excluded
+        from line counts.
+        """
+        repo = pygit2.Repository(str(self.repo_path))
+        if repo.head_is_unborn:
+            return []
+        mailmap = pygit2.Mailmap.from_repository(repo)
+        
+        # Each tree is needed twice: for its own commit and as the old side
+        # of its child's diff, so keep parents' trees until they are visited
+        trees = {}
         commits = []
+        
+        for commit in repo.walk(repo.head.target, pygit2.GIT_SORT_TIME):
+            if len(commit.parent_ids) > 1:
+                trees.pop(commit.id, None)
+                continue
+            
+            author = mailmap.resolve_signature(commit.author)
+            current_commit = {
+                "hash": str(commit.id),
+                "author": author.name,
+                "email": author.email,
+                "timestamp": commit.author.time,
+                "subject": commit.message.strip().split("\n\n", 1)[0].replace("\n", " "),
+                "additions": 0,
+                "deletions": 0,
+                "files_changed": []
+            }
+            commits.append(current_commit)
+            if not with_stats:
+                continue
+            
+            tree = trees.pop(commit.id, None) or commit.tree
+            if commit.parents:
+                parent = commit.parents[0]
+                parent_tree = trees.setdefault(parent.id, parent.tree)
+                diff = parent_tree.diff_to_tree(tree)
+            else:
+                diff = tree.diff_to_tree(swap=True)
+            diff.find_similar()
+            
+            for patch in diff:
+                if patch.delta.is_binary:
+                    continue
+                _, add, delete = patch.line_stats
+                current_commit["additions"] += add
+                current_commit["deletions"] += delete
+                current_commit["files_changed"].append({
+                    "name": patch.delta.new_file.path,
+                    "additions": add,
+                    "deletions": delete
+                })
+        
+        return commits
+    
+    def _iter_commits(self, with_stats: bool = True) -> Iterator[Dict[str, Any]]:
+        """Parse commits from a streamed git log, yielding each as it completes.
+        
+        Per-file stats come from ``--numstat``, which dominates the log
+        volume, so it is only requested ``with_stats``.
+        """
+        log = self._stream_git(
+            "log",
+            "--pretty=format:%H%x1f%aN%x1f%aE%x1f%at%x1f%s",
+            *(["--numstat"] if with_stats else []),
+            "--no-merges"
+        )
+        
         current_commit = None
         
-        for line in log.split("\n"):
-            if "|" in line and len(line.split("|")) == 5:
+        for line in log:
+            header = _COMMIT_HEADER_RE.match(line)
+            if header:
                 # New commit header
                 if current_commit:
-                    commits.append(current_commit)
+                    yield current_commit
                 
-                hash_, author, email, timestamp, subject = line.split("|")
+                hash_, author, email, timestamp, subject = header.groups()
                 current_commit = {
                     "hash": hash_,
                     "author": author,
                     "email": email,
                     "timestamp": int(timestamp),
-                    "datetime": datetime.fromtimestamp(int(timestamp)),
                     "subject": subject,
                     "additions": 0,
                     "deletions": 0,
                     "files_changed": []
                 }
-            elif line and current_commit and "\t" in line:
-                # File change stats
-                parts = line.split("\t")
-                if len(parts) == 3:
-                    add, delete, filename = parts
-                    if add != "-" and delete != "-":
-                        current_commit["additions"] += int(add)
-                        current_commit["deletions"] += int(delete)
-                        current_commit["files_changed"].append({
-                            "name": filename,
-                            "additions": int(add),
-                            "deletions": int(delete)
-                        })
+            elif current_commit:
+                # File change stats (binary files report "-" and are skipped)
+                numstat = _NUMSTAT_RE.match(line)
+                if numstat:
+                    add, delete = int(numstat.group(1)), int(numstat.group(2))
+                    current_commit["additions"] += add
+                    current_commit["deletions"] += delete
+                    current_commit["files_changed"].append({
+                        "name": numstat.group(3),
+                        "additions": add,
+                        "deletions": delete
+                    })
         
         if current_commit:
-            commits.append(current_commit)
-        
-        return commits
+            yield current_commit
     
     def _get_file_stats(self) -> Dict[str, int]:
         """Get file type distribution."""
         try:
-            files = self._run_git("ls-files").split("\n")
+            return dict(Counter(
+                _file_extension(file)
+                for file in self._stream_git("ls-files")
+                if file
+            ))
         except subprocess.CalledProcessError:
             return {}
-        
-        stats = defaultdict(int)
-        for file in files:
-            if not file:
-                continue
-            ext = Path(file).suffix or "no-extension"
-            stats[ext] += 1
-        
-        return dict(stats)
     
-    def _get_contributors(self) -> List[Dict[str, Any]]:
-        """Get contributor statistics."""
-        try:
-            shortlog = self._run_git("shortlog", "-sne", "--no-merges")
-        except subprocess.CalledProcessError:
-            return []
+    def _get_contributors(
+        self,
+        commits: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get contributor statistics.
         
-        contributors = []
-        for line in shortlog.split("\n"):
-            if not line.strip():
-                continue
-            # Format: "    12  Author Name <email>"
-            parts = line.strip().split("\t")
-            if len(parts) == 2:
-                count = int(parts[0])
-                # Extract name and email
-                author_email = parts[1]
-                if "<" in author_email and ">" in author_email:
-                    name = author_email[:author_email.index("<")].strip()
-                    email = author_email[author_email.index("<")+1:author_email.index(">")]
-                else:
-                    name = author_email
-                    email = ""
-                
-                contributors.append({
-                    "name": name,
-                    "email": email,
-                    "commits": count
-                })
+        Counted from the parsed log (authors are already .mailmap-resolved),
+        matching ``git shortlog -sne --no-merges`` without another git process.
+        """
+        if commits is None:
+            commits = self._get_commits(with_stats=False)
         
-        return contributors
+        counts = defaultdict(int)
+        for commit in commits:
+            counts[(commit["author"], commit["email"])] += 1
+        
+        # Most active first, like shortlog -n
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            {"name": name, "email": email, "commits": count}
+            for (name, email), count in ranked
+        ]
     
-    def _get_timeline(self) -> Dict[str, int]:
-        """Get commit activity over time (by month)."""
-        commits = self._get_commits()
+    def _get_timeline(
+        self,
+        commits: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, int]:
+        """Get commit activity over time (by month).
+        
+        Pass already-parsed commits to avoid reading the log a second time.
+        """
+        if commits is None:
+            commits = self._get_commits()
         timeline = defaultdict(int)
         
         for commit in commits:
-            month = commit["datetime"].strftime("%Y-%m")
+            month = _month(commit["timestamp"])
             timeline[month] += 1
         
         return dict(sorted(timeline.items()))
@@ -62,6 +62,17 @@ def main():
         default=42,
         help="Random seed for reproducibility (default: 42)"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-analyze the repository instead of reusing cached results"
+    )
+    parser.add_argument(
+        "--libgit2",
+        action="store_true",
+        help="Read history in-process with pygit2 instead of the git CLI "
+             "(requires the 'libgit2' extra; usually slower on large histories)"
+    )
     
     args = parser.parse_args()
     
@@ -71,11 +82,29 @@ def main():
         print(f"Error: Not a git repository: {repo_path}", file=sys.stderr)
         sys.exit(1)
     
+    if args.libgit2:
+        try:
+            import pygit2  # noqa: F401
+        except ImportError:
+            print(
+                "Error: --libgit2 requires pygit2 "
+                "(pip install 'repo-art-generator[libgit2]')",
+                file=sys.stderr
+            )
+            sys.exit(1)
+    
     print(f"🎨 Analyzing repository: {repo_path}")
     
     # Extract features
-    analyzer = RepositoryAnalyzer(str(repo_path))
-    features = analyzer.extract_features()
+    analyzer = RepositoryAnalyzer(
+        str(repo_path),
+        use_cache=not args.no_cache,
+        use_libgit2=args.libgit2
+    )
+    # Only particle art and audio use per-commit line counts
+    features = analyzer.extract_features(
+        with_stats=args.style == "particle" or bool(args.audio)
+    )
     
     commit_count = len(features["commits"])
     contributor_count = len(features["contributors"])
@@ -1,11 +1,104 @@
 """Generate music from repository data."""
 
-import math
-import struct
 import wave
-from typing import Dict, Any, List
+from typing import Dict, Any
 from pathlib import Path
 
+import numpy as np
+
+from .analyzer import commit_arrays
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _jit(func):
+    """Compile a numeric kernel with Numba when it is installed."""
+    if numba is None:
+        return func
+    return numba.njit(fastmath=True, cache=True)(func)
+
+
+@_jit
+def _synthesize(
+    timestamps: np.ndarray,
+    additions: np.ndarray,
+    activity: np.ndarray,
+    min_time: int,
+    time_range: int,
+    max_activity: int,
+    note_time: np.ndarray,
+    envelope: np.ndarray,
+    sample_rate: int,
+    duration_per_commit: float,
+    base_freq: float
+) -> np.ndarray:
+    """Mix one harmonic note per commit into a mono float32 buffer.
+    
+    ``note_time`` and ``envelope`` are the shared per-sample time grid and
+    ADSR gain of a single note. Runs as plain NumPy, or as a compiled
+    kernel when Numba is available.
+    """
+    n_commits = timestamps.shape[0]
+    
+    # Total audio duration (scale to reasonable length)
+    total_duration = min(60.0, n_commits * duration_per_commit)
+    total_samples = int(total_duration * sample_rate)
+    
+    # Initialize audio buffer
+    audio = np.zeros(total_samples, dtype=np.float32)
+    
+    note_samples = note_time.shape[0]
+    
+    # Generate note for each commit
+    for k in range(n_commits):
+        # Time position in audio
+        t_norm = (timestamps[k] - min_time) / time_range
+        start_sample = int(t_norm * total_samples)
+        
+        # Calculate frequency based on additions/deletions ratio
+        if activity[k] > 0:
+            add_ratio = additions[k] / activity[k]
+            # More additions = higher pitch, more deletions = lower pitch
+            frequency_multiplier = 0.5 + add_ratio * 1.5  # Range: 0.5x to 2x
+        else:
+            frequency_multiplier = 1.0
+        
+        two_pi_f = 2 * np.pi * base_freq * frequency_multiplier
+        
+        # Volume based on activity
+        volume = min(1.0, (activity[k] / max_activity) * 0.5)
+        
+        # Note length, truncated at the end of the buffer
+        n = min(note_samples, total_samples - start_sample)
+        if n <= 0:
+            continue
+        
+        # Time within note
+        t = note_time[:n]
+        
+        # Sine wave with harmonics for richer sound:
+        #   sin(p) + 0.3 * sin(2p) + 0.1 * sin(3p)
+        # expanded with sin(2p) = 2 sin(p) cos(p) and
+        # sin(3p) = 3 sin(p) - 4 sin(p)^3 so one shared phase buffer
+        # feeds a single sin/cos pair
+        phase = two_pi_f * t
+        sin_p = np.sin(phase)
+        tone = sin_p * (1.3 + 0.6 * np.cos(phase) - 0.4 * sin_p * sin_p)
+        
+        # Apply envelope and volume, then mix (scaled to prevent clipping)
+        audio[start_sample:start_sample + n] += (tone * envelope[:n] * (volume * 0.3)).astype(np.float32)
+    
+    # Normalize to prevent clipping
+    if total_samples > 0:
+        max_val = np.abs(audio).max()
+        if max_val > 1.0:
+            audio /= max_val
+    
+    return audio
+
 
 class MusicGenerator:
     """Generate music/audio from repository features."""
@@ -19,6 +112,11 @@ class MusicGenerator:
         self.sample_rate = sample_rate
         self.duration_per_commit = duration_per_commit
         self.base_frequency = base_frequency
+        
+        # Every note shares the same time grid and envelope
+        note_samples = int(duration_per_commit * sample_rate)
+        self._note_time = np.arange(note_samples) / sample_rate
+        self._envelope = self._adsr_envelope(self._note_time, duration_per_commit)
     
     def generate(self, features: Dict[str, Any], output_path: str) -> None:
         """Generate audio file from repository features."""
@@ -28,12 +126,12 @@ class MusicGenerator:
             return
         
         # Generate audio samples
-        samples = self._generate_sonification(commits)
+        samples = self._generate_sonification(features)
         
         # Write WAV file
         self._write_wav(output_path, samples)
     
-    def _generate_sonification(self, commits: List[Dict[str, Any]]) -> List[float]:
+    def _generate_sonification(self, features: Dict[str, Any]) -> np.ndarray:
         """Convert commits to audio samples.
         
         Strategy:
@@ -43,80 +141,29 @@ class MusicGenerator:
         - Activity = volume
         - Temporal spacing preserved
         """
+        commits = features.get("commits", [])
         if not commits:
-            return []
-        
-        # Calculate total duration
-        timestamps = [c["timestamp"] for c in commits]
-        min_time, max_time = min(timestamps), max(timestamps)
-        time_range = max_time - min_time or 1
-        
-        # Total audio duration (scale to reasonable length)
-        total_duration = min(60.0, len(commits) * self.duration_per_commit)
-        total_samples = int(total_duration * self.sample_rate)
-        
-        # Initialize audio buffer
-        audio = [0.0] * total_samples
-        
-        # Max activity for normalization
-        max_activity = max(c["additions"] + c["deletions"] for c in commits) or 1
-        
-        # Generate note for each commit
-        for commit in commits:
-            # Time position in audio
-            t_norm = (commit["timestamp"] - min_time) / time_range
-            start_sample = int(t_norm * total_samples)
-            
-            # Calculate frequency based on additions/deletions ratio
-            activity = commit["additions"] + commit["deletions"]
-            if activity > 0:
-                add_ratio = commit["additions"] / activity
-                # More additions = higher pitch, more deletions = lower pitch
-                frequency_multiplier = 0.5 + add_ratio * 1.5  # Range: 0.5x to 2x
-            else:
-                frequency_multiplier = 1.0
-            
-            frequency = self.base_frequency * frequency_multiplier
-            
-            # Volume based on activity
-            volume = min(1.0, (activity / max_activity) * 0.5)
-            
-            # Note duration
-            note_duration = self.duration_per_commit
-            note_samples = int(note_duration * self.sample_rate)
-            
-            # Generate note with envelope (attack-decay-sustain-release)
-            for i in range(note_samples):
-                if start_sample + i >= total_samples:
-                    break
-                
-                # Time within note
-                t = i / self.sample_rate
-                
-                # ADSR envelope
-                envelope = self._adsr_envelope(t, note_duration)
-                
-                # Generate sine wave with harmonics for richer sound
-                sample = 0
-                sample += math.sin(2 * math.pi * frequency * t)  # Fundamental
-                sample += 0.3 * math.sin(2 * math.pi * frequency * 2 * t)  # 2nd harmonic
-                sample += 0.1 * math.sin(2 * math.pi * frequency * 3 * t)  # 3rd harmonic
-                
-                # Apply envelope and volume
-                sample *= envelope * volume
-                
-                # Add to audio buffer (mix)
-                audio[start_sample + i] += sample * 0.3  # Scale to prevent clipping
-        
-        # Normalize to prevent clipping
-        max_val = max(abs(s) for s in audio) or 1.0
-        if max_val > 1.0:
-            audio = [s / max_val for s in audio]
+            return np.zeros(0, dtype=np.float32)
         
-        return audio
+        # Normalized columns, precomputed by the analyzer when available
+        arrays = features if "timestamps" in features else commit_arrays(commits)
+        
+        return _synthesize(
+            arrays["timestamps"],
+            arrays["additions"],
+            arrays["activity"],
+            arrays["min_time"],
+            arrays["max_time"] - arrays["min_time"] or 1,
+            arrays["max_activity"] or 1,
+            self._note_time,
+            self._envelope,
+            self.sample_rate,
+            self.duration_per_commit,
+            self.base_frequency
+        )
     
     @staticmethod
-    def _adsr_envelope(t: float, duration: float) -> float:
+    def _adsr_envelope(t: np.ndarray, duration: float) -> np.ndarray:
         """Generate ADSR envelope for note.
         
         Attack, Decay, Sustain, Release
@@ -126,39 +173,40 @@ class MusicGenerator:
         release_time = min(0.05, duration * 0.3)
         sustain_level = 0.7
         
-        if t < attack_time:
-            # Attack: 0 -> 1
-            return t / attack_time
-        elif t < attack_time + decay_time:
-            # Decay: 1 -> sustain
-            progress = (t - attack_time) / decay_time
-            return 1.0 - (1.0 - sustain_level) * progress
-        elif t < duration - release_time:
-            # Sustain: hold
-            return sustain_level
-        else:
+        return np.select(
+            [
+                t < attack_time,
+                t < attack_time + decay_time,
+                t < duration - release_time,
+            ],
+            [
+                # Attack: 0 -> 1
+                t / attack_time,
+                # Decay: 1 -> sustain
+                1.0 - (1.0 - sustain_level) * (t - attack_time) / decay_time,
+                # Sustain: hold
+                np.full_like(t, sustain_level),
+            ],
             # Release: sustain -> 0
-            progress = (t - (duration - release_time)) / release_time
-            return sustain_level * (1.0 - progress)
+            sustain_level * (1.0 - (t - (duration - release_time)) / release_time)
+        )
     
-    def _write_wav(self, output_path: str, samples: List[float]) -> None:
+    def _write_wav(self, output_path: str, samples: np.ndarray) -> None:
         """Write audio samples to WAV file."""
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         
+        # Clamp to [-1.0, 1.0] and scale to little-endian int16 range
+        samples = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+        int_samples = (samples * 32767).astype('<i2')
+        
         with wave.open(output_path, 'w') as wav_file:
             # 1 channel (mono), 2 bytes per sample (16-bit)
             wav_file.setnchannels(1)
             wav_file.setsampwidth(2)
             wav_file.setframerate(self.sample_rate)
-            
-            # Convert float samples to 16-bit integers
-            for sample in samples:
-                # Clamp to [-1.0, 1.0] and scale to int16 range
-                sample = max(-1.0, min(1.0, sample))
-                int_sample = int(sample * 32767)
-                wav_file.writeframes(struct.pack('<h', int_sample))
+            wav_file.writeframes(int_samples.tobytes())
     
     def _write_silence(self, output_path: str, duration: float) -> None:
         """Write silent audio file."""
-        samples = [0.0] * int(duration * self.sample_rate)
+        samples = np.zeros(int(duration * self.sample_rate), dtype=np.float32)
         self._write_wav(output_path, samples)
@@ -5,6 +5,10 @@ import math
 from PIL import Image, ImageDraw
 from typing import Dict, Any, Tuple, List
 
+import numpy as np
+
+from .analyzer import commit_arrays
+
 
 class ArtGenerator:
     """Generate abstract art from repository features."""
@@ -21,6 +25,12 @@ class ArtGenerator:
         self.style = style
         self.seed = seed or 42
         random.seed(self.seed)
+        
+        # Heat colormap sampled at 256 intensity levels
+        self._heat_lut = np.array(
+            [self._intensity_to_color(i / 255) for i in range(256)],
+            dtype=np.uint8
+        )
     
     def generate(self, features: Dict[str, Any]) -> Image.Image:
         """Generate artwork from repository features."""
@@ -45,74 +55,79 @@ class ArtGenerator:
         if not commits:
             return img
         
-        # Normalize timestamps to canvas
-        timestamps = [c["timestamp"] for c in commits]
-        min_time, max_time = min(timestamps), max(timestamps)
-        time_range = max_time - min_time or 1
+        # Normalized columns, precomputed by the analyzer when available
+        arrays = features if "timestamps" in features else commit_arrays(commits)
+        timestamps = arrays["timestamps"]
+        additions = arrays["additions"]
+        activity = arrays["activity"]
+        min_time = arrays["min_time"]
+        time_range = arrays["max_time"] - min_time or 1
+        max_activity = arrays["max_activity"] or 1
+        
+        # Position: time-based x, activity-based y
+        t_norm = (timestamps - min_time) / time_range
+        xs = (t_norm * (self.width - 100)).astype(np.int64) + 50
+        activity_norm = activity / max_activity
+        ys = ((1 - activity_norm) * (self.height - 100)).astype(np.int64) + 50
+        
+        # Size based on changes
+        sizes = np.clip((activity_norm * 15).astype(np.int64), 2, 20)
+        
+        # Color based on add/delete ratio: warm colors for additions,
+        # cool for deletions, grey for commits without line changes
+        active = activity > 0
+        add_ratio = np.divide(
+            additions, activity,
+            out=np.zeros(len(commits)), where=active
+        )
+        colors = np.where(
+            active[:, None],
+            np.stack([
+                (255 * add_ratio).astype(np.int64),
+                (100 + 155 * activity_norm).astype(np.int64),
+                (255 * (1 - add_ratio)).astype(np.int64),
+            ], axis=1),
+            128
+        )
         
-        # Calculate total activity for normalization
-        max_activity = max(c["additions"] + c["deletions"] for c in commits) or 1
+        # Glow rings, outermost first (the innermost ring would be hidden
+        # by the core)
+        background = np.array((10, 10, 20))
+        glows = []
+        for glow in range(3, 1, -1):
+            alpha = int(100 / glow) / 255
+            glow_colors = (colors * alpha + background * (1 - alpha)).astype(np.int64)
+            glows.append((glow, glow_colors.tolist()))
         
         # Draw each commit as a particle
-        for i, commit in enumerate(commits):
-            # Position: time-based x, activity-based y
-            t_norm = (commit["timestamp"] - min_time) / time_range
-            x = int(t_norm * (self.width - 100)) + 50
-            
-            activity = commit["additions"] + commit["deletions"]
-            activity_norm = activity / max_activity
-            y = int((1 - activity_norm) * (self.height - 100)) + 50
-            
-            # Size based on changes
-            size = max(2, min(20, int(activity_norm * 15)))
-            
-            # Color based on add/delete ratio
-            if activity > 0:
-                add_ratio = commit["additions"] / activity
-                # Warm colors for additions, cool for deletions
-                r = int(255 * add_ratio)
-                b = int(255 * (1 - add_ratio))
-                g = int(100 + 155 * activity_norm)
-            else:
-                r, g, b = 128, 128, 128
-            
+        colors = colors.tolist()
+        for i, (x, y, size) in enumerate(zip(xs.tolist(), ys.tolist(), sizes.tolist())):
             # Add glow effect
-            for glow in range(3, 0, -1):
-                alpha = int(100 / glow)
-                glow_color = (r, g, b)
+            for glow, glow_colors in glows:
                 draw.ellipse(
                     [x - size * glow, y - size * glow,
                      x + size * glow, y + size * glow],
-                    fill=self._blend_color(glow_color, (10, 10, 20), alpha / 255)
+                    fill=tuple(glow_colors[i])
                 )
             
             # Draw core particle
             draw.ellipse(
                 [x - size, y - size, x + size, y + size],
-                fill=(r, g, b)
+                fill=tuple(colors[i])
             )
         
-        # Connect nearby particles with faint lines (temporal flow)
-        for i in range(len(commits) - 1):
-            c1, c2 = commits[i], commits[i + 1]
-            
-            t1 = (c1["timestamp"] - min_time) / time_range
-            x1 = int(t1 * (self.width - 100)) + 50
-            a1 = (c1["additions"] + c1["deletions"]) / max_activity
-            y1 = int((1 - a1) * (self.height - 100)) + 50
-            
-            t2 = (c2["timestamp"] - min_time) / time_range
-            x2 = int(t2 * (self.width - 100)) + 50
-            a2 = (c2["additions"] + c2["deletions"]) / max_activity
-            y2 = int((1 - a2) * (self.height - 100)) + 50
-            
-            # Only connect if not too far apart
-            if abs(x2 - x1) < 100:
-                draw.line(
-                    [x1, y1, x2, y2],
-                    fill=(50, 50, 80),
-                    width=1
-                )
+        # Connect nearby particles with faint lines (temporal flow),
+        # only if not too far apart. Each run of consecutive connected
+        # pairs is drawn as one polyline.
+        connected = np.abs(np.diff(xs)) < 100
+        bounds = np.flatnonzero(np.diff(np.concatenate(([0], connected, [0]))))
+        points = list(zip(xs.tolist(), ys.tolist()))
+        for start, stop in zip(bounds[::2].tolist(), bounds[1::2].tolist()):
+            draw.line(
+                points[start:stop + 1],
+                fill=(50, 50, 80),
+                width=1
+            )
         
         return img
     
@@ -158,56 +173,50 @@ class ArtGenerator:
                 
                 if len(points) > 1:
                     color = self._get_wave_color(intensity, wave)
-                    for i in range(len(points) - 1):
-                        draw.line([points[i], points[i+1]], fill=color, width=2)
+                    draw.line(points, fill=color, width=2)
         
         return img
     
     def _generate_heatmap_art(self, features: Dict[str, Any]) -> Image.Image:
         """Generate heatmap of activity over time."""
-        img = Image.new("RGB", (self.width, self.height), color=(5, 5, 10))
-        draw = ImageDraw.Draw(img)
+        background = (5, 5, 10)
+        img = Image.new("RGB", (self.width, self.height), color=background)
         
         timeline = features.get("timeline", {})
         if not timeline:
             return img
         
         months = sorted(timeline.keys())
-        max_commits = max(timeline.values())
+        counts = np.array([timeline[month] for month in months])
+        intensity = counts / counts.max()
         
         cell_width = self.width // (len(months) + 1)
         cell_height = self.height // 10
+        if cell_width < 1 or cell_height < 1:
+            return img
         
-        for i, month in enumerate(months):
-            commit_count = timeline[month]
-            intensity = commit_count / max_commits
-            
-            x = i * cell_width
-            color = self._intensity_to_color(intensity)
-            
-            for row in range(10):
-                y = row * cell_height
-                alpha = intensity * (1 - row * 0.08)  # Fade vertically
-                blend_color = self._blend_color(color, (5, 5, 10), alpha)
-                draw.rectangle(
-                    [x, y, x + cell_width - 2, y + cell_height - 2],
-                    fill=blend_color
-                )
+        # One color per (row, month) cell, fading vertically
+        colors = self._heat_lut[np.rint(intensity * 255).astype(np.uint8)]
+        alpha = intensity[None, :] * (1 - np.arange(10) * 0.08)[:, None]
+        alpha = alpha[:, :, None]
+        cells = colors[None, :, :] * alpha + np.array(background) * (1 - alpha)
+        
+        # Scale the 10 x months grid up to cell size in one resize
+        grid_width, grid_height = len(months) * cell_width, 10 * cell_height
+        tiles = Image.fromarray(cells.astype(np.uint8), "RGB")
+        img.paste(tiles.resize((grid_width, grid_height), Image.NEAREST), (0, 0))
+        
+        # Leave a 1px background gap after each cell
+        draw = ImageDraw.Draw(img)
+        for i in range(1, len(months) + 1):
+            x = i * cell_width - 1
+            draw.line([x, 0, x, grid_height - 1], fill=background)
+        for row in range(1, 11):
+            y = row * cell_height - 1
+            draw.line([0, y, grid_width - 1, y], fill=background)
         
         return img
     
-    @staticmethod
-    def _blend_color(
-        color1: Tuple[int, int, int],
-        color2: Tuple[int, int, int],
-        alpha: float
-    ) -> Tuple[int, int, int]:
-        """Blend two colors with alpha."""
-        return tuple(
-            int(c1 * alpha + c2 * (1 - alpha))
-            for c1, c2 in zip(color1, color2)
-        )
-    
     @staticmethod
     def _intensity_to_color(intensity: float) -> Tuple[int, int, int]:
         """Convert intensity (0-1) to heat color."""